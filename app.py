@@ -1,19 +1,20 @@
 # app.py
 
 import os
+import asyncio
 import streamlit as st
 from datetime import datetime
 from dotenv import load_dotenv
 load_dotenv()
 
 # modules
-from utils import render_chat_bubble
-from rag import RAGStore
-from booking_flow import start_booking_flow, handle_booking_turn
-from email_utils import send_confirmation_email
-from db import init_db, add_booking, get_bookings, delete_booking, export_bookings_csv
+from utils import render_chat_history, session_memory_report
+from chat_engine import ChatEngine
+from rag import corpus_id_for
+from db import init_db, get_bookings, delete_booking, export_bookings_csv
 from hotel_data import hotels
 from llm_utils import get_llm_client, generate_answer
+from tracing import span, latency_summary, dump_metrics, reset_metrics, trace_output_status
 
 # ----------------------------------------------------------
 # PAGE CONFIG
@@ -75,20 +76,19 @@ html, body, [class*="css"] { font-family: 'Inter', sans-serif; }
 # ----------------------------------------------------------
 init_db()
 
-if "chat" not in st.session_state:
-    st.session_state.chat = [{
-        "role": "assistant",
-        "content": "Hello! 👋 I’m GuidePro AI. How can I assist your travel today?"
-    }]
+# One engine (and LLM client) per server process; all chat logic lives in chat_engine.py
+@st.cache_resource
+def get_engine():
+    return ChatEngine(get_llm_client())
 
-if "rag" not in st.session_state:
-    st.session_state.rag = RAGStore()
+engine = get_engine()
 
-if "llm_client" not in st.session_state:
-    st.session_state.llm_client = get_llm_client()
+# Each session only holds its ConversationState: a recent chat window plus booking
+# slots. Full history is in the DB and RAG stores are shared by corpus id.
+if "conversation" not in st.session_state:
+    st.session_state.conversation = engine.new_conversation()
 
-if "booking_in_progress" not in st.session_state:
-    st.session_state.booking_in_progress = False
+conv = st.session_state.conversation
 
 # ----------------------------------------------------------
 # SIDEBAR
@@ -98,14 +98,24 @@ with st.sidebar:
 
     page = st.radio("Navigate", ["Chat Assistant", "Trip Planner", "Hotels Browser", "Admin", "About"])
 
+    # hidden metrics page, reachable only via ?metrics=1
+    if st.query_params.get("metrics") == "1":
+        page = "Metrics"
+
     st.markdown("<div class='sidebar-section'>Upload PDF for RAG</div>", unsafe_allow_html=True)
 
     uploaded = st.file_uploader("Upload PDF file", type=["pdf"], accept_multiple_files=False)
 
     if uploaded:
-        st.session_state.rag = RAGStore()
-        st.session_state.rag.add_pdf(uploaded)
-        st.success("PDF uploaded successfully!")
+        # re-load also when the shared store was evicted, not only when the file changes
+        if conv.rag_corpus_id != corpus_id_for(uploaded) or engine.needs_pdf_reload(conv):
+            n_chunks = engine.load_pdf(conv, uploaded)
+            if n_chunks:
+                st.success(f"PDF processed — {n_chunks} chunks added.")
+            else:
+                st.error("PDF contains no readable text.")
+        if conv.rag_corpus_id:
+            st.success("PDF uploaded successfully!")
 
 # ----------------------------------------------------------
 # CHAT PAGE
@@ -121,47 +131,23 @@ if page == "Chat Assistant":
     </div>
     """, unsafe_allow_html=True)
 
+    # older history stays in the DB until asked for
+    if engine.has_earlier_messages(conv):
+        if st.button("Load earlier messages"):
+            engine.load_earlier_messages(conv)
+            st.rerun()
+
     # render chat
-    for msg in st.session_state.chat:
-        render_chat_bubble(msg)
+    with span("chat.render"):
+        render_chat_history(conv.chat)
 
     st.markdown("---")
 
     new_input = st.chat_input("Type your message…")
 
     if new_input:
-        user_msg = new_input.lower()
-        st.session_state.chat.append({"role": "user", "content": new_input})
-
-        # ----------------------------------------------------
-        # 1) RAG TRIGGER — FIRST PRIORITY (fix for room types)
-        # ----------------------------------------------------
-        rag_keywords = [
-            "room", "rooms", "room type", "room types", "amenities", "features",
-            "summary", "pdf", "document", "information", "details",
-            "policy", "faq", "hotel", "rules"
-        ]
-
-        if len(st.session_state.rag.chunks) > 0:
-            # Trigger RAG for any informational query
-            if "?" in user_msg or any(k in user_msg for k in rag_keywords):
-                answer = st.session_state.rag.query(new_input)
-                st.session_state.chat.append({"role": "assistant", "content": answer})
-                st.rerun()
-
-        # ----------------------------------------------------
-        # 2) BOOKING FLOW
-        # ----------------------------------------------------
-        if start_booking_flow(new_input) or st.session_state.booking_in_progress:
-            resp = handle_booking_turn(new_input)
-            st.session_state.chat.append({"role": "assistant", "content": resp})
-            st.rerun()
-
-        # ----------------------------------------------------
-        # 3) LLM FALLBACK
-        # ----------------------------------------------------
-        reply = generate_answer(st.session_state.llm_client, st.session_state.chat)
-        st.session_state.chat.append({"role": "assistant", "content": reply})
+        # RAG → booking flow → LLM fallback, see ChatEngine.route
+        asyncio.run(engine.handle_message(conv, new_input))
         st.rerun()
 
 # ----------------------------------------------------------
@@ -174,7 +160,7 @@ elif page == "Trip Planner":
     destination = st.text_input("Destination")
     if st.button("Generate Itinerary"):
         q = f"Create a detailed 3-day {trip_type} trip itinerary for {guests} guests to {destination}."
-        st.write(generate_answer(st.session_state.llm_client, [{"role": "user", "content": q}]))
+        st.write(generate_answer(engine.llm_client, [{"role": "user", "content": q}]))
 
 # ----------------------------------------------------------
 # HOTELS BROWSER
@@ -207,6 +193,27 @@ elif page == "Admin":
         delete_booking(del_id)
         st.success("Deleted")
 
+    st.subheader("Session Memory")
+    st.table(session_memory_report())
+
+# ----------------------------------------------------------
+# METRICS PAGE (hidden)
+# ----------------------------------------------------------
+elif page == "Metrics":
+    st.header("Latency Metrics")
+    st.caption("Per-stage latency in ms. Set GUIDEPRO_TRACING=1 to collect spans.")
+    st.table(latency_summary())
+
+    status = trace_output_status()
+    st.caption(f"Span log: {status['path']} ({'on' if status['enabled'] else 'off'}, {status['dropped']} events dropped)")
+
+    if st.button("Dump JSONL"):
+        st.success(f"Written to {dump_metrics()}")
+
+    if st.button("Reset"):
+        reset_metrics()
+        st.rerun()
+
 # ----------------------------------------------------------
 # ABOUT PAGE
 # ----------------------------------------------------------
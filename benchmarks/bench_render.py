@@ -0,0 +1,80 @@
+# benchmarks/bench_render.py
+#
+# Render time of the chat history against its length, and bubble-cache hit
+# rate when many sessions rerender their windows.
+# Run from the repo root:  python benchmarks/bench_render.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import BUBBLE_CACHE_SIZE, bubble_html, bubble_cache_info, clear_bubble_cache
+
+HISTORY_LENGTHS = [10, 100, 1000, 5000]
+
+# Concurrent sessions, each rerendering a 30-message window
+SESSION_COUNTS = [100, 500, 1000]
+WINDOW = 30
+
+SAMPLE_REPLY = """
+### 📄 Booking Summary
+
+- **Name:** Jane Doe
+- **Destination:** Goa
+- **Guests:** 2
+
+Does everything look correct?  
+Please reply **Yes** or **No**.
+"""
+
+
+def make_history(n, first_id=0):
+    return [
+        {"id": i, "role": "user" if i % 2 else "assistant",
+         "content": f"message {i} with **bold** text" if i % 2 else f"{SAMPLE_REPLY} ({i})"}
+        for i in range(first_id, first_id + n)
+    ]
+
+
+def render(messages):
+    """Same work as utils.render_chat_history minus the st.markdown call."""
+    return "\n".join(bubble_html(m["role"], m["content"], msg_id=m["id"]) for m in messages)
+
+
+def timed(func, *args):
+    before = bubble_cache_info()
+    t0 = time.perf_counter()
+    out = func(*args)
+    ms = (time.perf_counter() - t0) * 1000
+    info = bubble_cache_info()
+    lookups = (info["hits"] + info["misses"]) - (before["hits"] + before["misses"])
+    hit_rate = (info["hits"] - before["hits"]) / lookups if lookups else 0.0
+    return out, ms, hit_rate
+
+
+def main():
+    print(f"Bubble cache size: {BUBBLE_CACHE_SIZE}\n")
+
+    print(f"{'messages':>10} {'cold ms':>10} {'warm ms':>10} {'warm hits':>10} {'KB html':>10}")
+    for n in HISTORY_LENGTHS:
+        history = make_history(n)
+        clear_bubble_cache()
+        html, cold, _ = timed(render, history)
+        _, warm, hit_rate = timed(render, history)
+        print(f"{n:>10} {cold:>10.2f} {warm:>10.2f} {hit_rate:>10.0%} {len(html) / 1024:>10.1f}")
+
+    print(f"\n{'sessions':>10} {'cold ms':>10} {'warm ms':>10} {'warm hits':>10}")
+    for n_sessions in SESSION_COUNTS:
+        windows = [make_history(WINDOW, first_id=s * WINDOW) for s in range(n_sessions)]
+        clear_bubble_cache()
+        _, cold, _ = timed(lambda: [render(w) for w in windows])
+        # every session reruns once
+        _, warm, hit_rate = timed(lambda: [render(w) for w in windows])
+        note = "" if hit_rate > 0.99 else "  (working set exceeds cache)"
+        print(f"{n_sessions:>10} {cold:>10.2f} {warm:>10.2f} {hit_rate:>10.0%}{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# benchmarks/load_test.py
+#
+# Local load generator for the chat engine. Spawns worker processes, each
+# running `--concurrency` simulated users, and reports requests/sec and
+# latency percentiles across all workers.
+#
+#   python benchmarks/load_test.py --workers 4 --concurrency 8 --users 40
+#       in-process ChatEngine with stub LLM, embedding and email, temp SQLite
+#   python benchmarks/load_test.py --url http://127.0.0.1:8000 --workers 4
+#       against a running server.py (uvicorn server:app --workers 4)
+
+import os
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+import multiprocessing as mp
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import StubLLMClient, install_stub_email, stub_embedding
+
+# One simulated user's conversation: small talk, a full booking, a follow-up
+USER_SCRIPT = [
+    "hi there",
+    "I want to book a hotel", "Jane Doe", "jane@example.com", "5550100",
+    "Goa", "2026-01-01", "2026-01-05", "2", "yes",
+    "thanks, what should I pack for Goa",
+]
+
+
+def _engine_sender(db_path):
+    install_stub_email()
+    import db
+    db.DB_PATH = db_path
+    import rag
+    rag.get_embedding = stub_embedding
+    from chat_engine import ChatEngine
+    engine = ChatEngine(StubLLMClient())
+
+    def new_user():
+        state = engine.new_conversation()
+
+        async def send(message):
+            await engine.handle_message(state, message)
+        return send
+    return new_user
+
+
+def _http_sender(url):
+    import requests
+
+    def new_user():
+        conversation_id = uuid.uuid4().hex
+        session = requests.Session()
+
+        def post(message):
+            resp = session.post(f"{url}/chat", json={"conversation_id": conversation_id, "message": message}, timeout=60)
+            resp.raise_for_status()
+
+        async def send(message):
+            await asyncio.to_thread(post, message)
+        return send
+    return new_user
+
+
+async def _run_users(new_user, users, concurrency):
+    latencies = []
+    errors = 0
+    sem = asyncio.Semaphore(concurrency)
+
+    async def user():
+        nonlocal errors
+        async with sem:
+            send = new_user()
+            for message in USER_SCRIPT:
+                t0 = time.perf_counter()
+                try:
+                    await send(message)
+                    latencies.append((time.perf_counter() - t0) * 1000)
+                except Exception as e:
+                    errors += 1
+                    print("❌ Request failed:", e)
+
+    # wall-clock (not perf_counter) so windows from different processes line up
+    started = time.time()
+    await asyncio.gather(*(user() for _ in range(users)))
+    return latencies, errors, started, time.time()
+
+
+def _worker(args):
+    url, db_path, users, concurrency = args
+    new_user = _http_sender(url) if url else _engine_sender(db_path)
+    return asyncio.run(_run_users(new_user, users, concurrency))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GuidePro AI load generator")
+    parser.add_argument("--url", help="base URL of server.py; omit to drive ChatEngine in-process")
+    parser.add_argument("--workers", type=int, default=2, help="worker processes")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent users per worker")
+    parser.add_argument("--users", type=int, default=20, help="users per worker")
+    args = parser.parse_args()
+
+    db_path = None
+    if not args.url:
+        from synthetic import use_temp_db
+        db_path = use_temp_db()
+
+    ctx = mp.get_context("spawn")
+    t0 = time.time()
+    try:
+        with ctx.Pool(args.workers) as pool:
+            results = pool.map(_worker, [(args.url, db_path, args.users, args.concurrency)] * args.workers)
+    finally:
+        if db_path:
+            os.remove(db_path)
+    total = time.time() - t0
+
+    # Throughput is measured from the first request to the last response across
+    # all workers, excluding process spawn and imports
+    window = max(r[3] for r in results) - min(r[2] for r in results)
+    latencies = np.array([lat for r in results for lat in r[0]])
+    errors = sum(r[1] for r in results)
+    target = args.url or "in-process ChatEngine"
+    print(f"\nTarget:      {target}")
+    print(f"Workers:     {args.workers} × {args.concurrency} concurrent users ({args.users} users each)")
+    print(f"Requests:    {len(latencies)} ok, {errors} failed in {window:.2f}s ({total:.2f}s incl. worker startup)")
+    if len(latencies):
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"Throughput:  {len(latencies) / window:.1f} req/s")
+        print(f"Latency ms:  p50 {p50:.2f}  p95 {p95:.2f}  p99 {p99:.2f}  max {latencies.max():.2f}")
+
+
+if __name__ == "__main__":
+    main()
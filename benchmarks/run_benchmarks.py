@@ -0,0 +1,328 @@
+# benchmarks/run_benchmarks.py
+#
+# Offline benchmark suite for the RAG, booking and DB hot paths.
+# Each case runs in a fresh process so peak RSS is per case.
+#
+#   python benchmarks/run_benchmarks.py                   # run and compare to baseline.json
+#   python benchmarks/run_benchmarks.py --full            # also run the largest sizes (up to 1M)
+#   python benchmarks/run_benchmarks.py --only rag.query  # run cases whose name starts with this
+#   python benchmarks/run_benchmarks.py --update-baseline # store these results as the new baseline
+#
+# Timings only mean something on the machine that produced them, so the
+# baseline is local (not committed) and records the host it was taken on
+# (machine, processor, CPU count, OS and Python version; not the hostname,
+# which changes per run in containers and CI). Create one with
+# --update-baseline before comparing; a baseline from another host is
+# reported and ignored unless --force-compare is given.
+#
+# Exits with status 1 when a case regresses past the tolerance.
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import multiprocessing as mp
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import (
+    random_words, make_pdf, stub_embedding, random_embeddings,
+    StubLLMClient, install_stub_email, use_temp_db, fill_bookings,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Relative slowdown (p50, p95) or RSS growth that counts as a regression
+DEFAULT_TOLERANCE = 0.25
+# Differences below this many ms are treated as timer noise
+NOISE_FLOOR_MS = 0.1
+
+
+# -------------------------------
+# Cases
+# Each returns (latencies_ms, items_per_op)
+# -------------------------------
+def bench_chunk_text(n_chunks, repeats=5):
+    from rag import chunk_text
+    text = " ".join(random_words(n_chunks * 300))
+    latencies = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        chunk_text(text)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return latencies, n_chunks
+
+
+def bench_add_pdf(pages, repeats=3):
+    import rag
+    rag.get_embedding = stub_embedding
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    make_pdf(path, pages=pages)
+    latencies = []
+    try:
+        for _ in range(repeats):
+            store = rag.RAGStore()
+            t0 = time.perf_counter()
+            with open(path, "rb") as f:
+                store.add_pdf(f)
+            latencies.append((time.perf_counter() - t0) * 1000)
+    finally:
+        os.remove(path)
+    return latencies, len(store.chunks)
+
+
+def bench_query(n_chunks, queries=20):
+    import rag
+    rag.get_embedding = stub_embedding
+    store = rag.RAGStore()
+    store.chunks = [f"chunk {i}" for i in range(n_chunks)]
+    store.embeddings = list(random_embeddings(n_chunks))
+    latencies = []
+    for i in range(queries):
+        t0 = time.perf_counter()
+        store.query(f"what room types are available {i}?")
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return latencies, 1
+
+
+BOOKING_TURNS = [
+    "I want to book a hotel", "Jane Doe", "jane@example.com", "5550100",
+    "Goa", "2026-01-01", "2026-01-05", "2", "yes",
+]
+
+
+def bench_booking_flow(flows):
+    install_stub_email()
+    path = use_temp_db()
+    from booking_flow import start_booking_flow, handle_booking_turn
+    from chat_engine import ConversationState
+    latencies = []
+    try:
+        for _ in range(flows):
+            state = ConversationState()
+            t0 = time.perf_counter()
+            for turn in BOOKING_TURNS:
+                if start_booking_flow(turn, state) or state.booking_in_progress:
+                    handle_booking_turn(turn, state)
+            latencies.append((time.perf_counter() - t0) * 1000)
+    finally:
+        os.remove(path)
+    return latencies, len(BOOKING_TURNS)
+
+
+SAMPLE_BOOKING = {
+    "name": "Jane Doe", "email": "jane@example.com", "phone": "5550100",
+    "hotel": "Goa", "destination": "Goa", "checkin": "2026-01-01",
+    "checkout": "2026-01-05", "guests": 2, "notes": "",
+}
+
+
+def bench_add_booking(table_rows, inserts=200):
+    path = use_temp_db()
+    fill_bookings(table_rows)
+    from db import add_booking
+    latencies = []
+    try:
+        for _ in range(inserts):
+            t0 = time.perf_counter()
+            add_booking(SAMPLE_BOOKING)
+            latencies.append((time.perf_counter() - t0) * 1000)
+    finally:
+        os.remove(path)
+    return latencies, 1
+
+
+def bench_get_bookings(table_rows, repeats=5):
+    path = use_temp_db()
+    fill_bookings(table_rows)
+    from db import get_bookings
+    latencies = []
+    try:
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            get_bookings()
+            latencies.append((time.perf_counter() - t0) * 1000)
+    finally:
+        os.remove(path)
+    return latencies, table_rows
+
+
+def bench_generate_answer(history_len, calls=200):
+    from llm_utils import generate_answer
+    client = StubLLMClient()
+    history = [
+        {"role": "user" if i % 2 else "assistant", "content": " ".join(random_words(40, seed=i))}
+        for i in range(history_len)
+    ]
+    latencies = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        generate_answer(client, history)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return latencies, 1
+
+
+# name -> (function, default sizes, extra sizes for --full)
+CASES = {
+    "chunk_text": (bench_chunk_text, [1_000, 10_000], [100_000]),
+    "rag.add_pdf": (bench_add_pdf, [10, 100], [500]),
+    "rag.query": (bench_query, [1_000, 10_000, 100_000], [1_000_000]),
+    "booking.flow": (bench_booking_flow, [50], []),
+    "db.add_booking": (bench_add_booking, [1_000, 100_000], [1_000_000]),
+    "db.get_bookings": (bench_get_bookings, [1_000, 100_000], [1_000_000]),
+    "llm.generate_answer": (bench_generate_answer, [10, 100], []),
+}
+
+
+# -------------------------------
+# Runner
+# -------------------------------
+def _peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _run_case(name, size):
+    func = CASES[name][0]
+    latencies, items_per_op = func(size)
+    lat = np.array(latencies)
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    return {
+        "ops": len(latencies),
+        "items_per_s": round(items_per_op * len(lat) / (lat.sum() / 1000), 2) if lat.sum() else None,
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def run_all(full=False, only=None):
+    ctx = mp.get_context("spawn")
+    results = {}
+    for name, (_, sizes, full_sizes) in CASES.items():
+        if only and not name.startswith(only):
+            continue
+        for size in sizes + (full_sizes if full else []):
+            key = f"{name}@{size}"
+            print(f"running {key} ...", flush=True)
+            with ctx.Pool(1) as pool:
+                results[key] = pool.apply(_run_case, (name, size))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return (regression lines, names of the cases that had a baseline entry)."""
+    regressions = []
+    compared = []
+    for key, cur in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        compared.append(key)
+        for metric in ("p50_ms", "p95_ms"):
+            if cur[metric] - base[metric] > NOISE_FLOOR_MS and cur[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{key}: {metric} {base[metric]} -> {cur[metric]}")
+        if cur["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{key}: peak_rss_mb {base['peak_rss_mb']} -> {cur['peak_rss_mb']}")
+    return regressions, compared
+
+
+def host_info():
+    """Identifies the machine a baseline was taken on."""
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "system": platform.system(),
+        "python": platform.python_version(),
+    }
+
+
+def load_baseline(path):
+    """Return (host, results) from a baseline file, or (None, {}) if there is none."""
+    if not os.path.exists(path):
+        return None, {}
+    with open(path) as f:
+        data = json.load(f)
+    return data.get("host"), data.get("results", {})
+
+
+def print_table(results, baseline):
+    header = f"{'case':<28} {'items/s':>12} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'rss MB':>8} {'vs base p50':>12}"
+    print(header)
+    print("-" * len(header))
+    for key, r in results.items():
+        base = baseline.get(key)
+        delta = f"{(r['p50_ms'] / base['p50_ms'] - 1) * 100:+.0f}%" if base and base["p50_ms"] else "-"
+        print(f"{key:<28} {r['items_per_s'] or 0:>12.1f} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} "
+              f"{r['p99_ms']:>10.3f} {r['peak_rss_mb']:>8.1f} {delta:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GuidePro AI offline benchmarks")
+    parser.add_argument("--full", action="store_true", help="include the largest sizes")
+    parser.add_argument("--only", help="run only cases whose name starts with this")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--force-compare", action="store_true",
+                        help="compare even if the baseline was recorded on a different host")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--output", help="also write results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_all(full=args.full, only=args.only)
+
+    host = host_info()
+    baseline_host, baseline = load_baseline(args.baseline)
+    if baseline_host is not None:
+        differs = {k: (baseline_host.get(k), v) for k, v in host.items() if baseline_host.get(k) != v}
+        if differs and not args.force_compare:
+            print(f"\n⚠️  {args.baseline} was recorded on another host {differs}; not comparing "
+                  f"(use --force-compare to compare anyway).")
+            baseline = {}
+
+    print()
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({"host": host, "results": baseline}, f, indent=2, sort_keys=True)
+        print(f"\nBaseline updated: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("\nNo baseline for this host yet. Run with --update-baseline on an unchanged tree first.")
+        return 0
+
+    regressions, compared = compare(results, baseline, args.tolerance)
+    if not compared:
+        print("\n⚠️  Nothing compared: none of the cases run are in the baseline.")
+        return 0
+    missing = [key for key in results if key not in compared]
+    if missing:
+        print(f"\nNot in baseline (not compared): {', '.join(missing)}")
+    if regressions:
+        print("\n❌ Regressions:")
+        for line in regressions:
+            print("  " + line)
+        return 1
+    print(f"\n✅ No regressions against baseline ({len(compared)} cases compared).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
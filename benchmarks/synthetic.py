@@ -0,0 +1,147 @@
+# benchmarks/synthetic.py
+#
+# Offline fixtures for the benchmark suite: synthetic PDFs, a stub embedding,
+# a stub LLM client, a stub email sender and a temp SQLite database.
+
+import os
+import sys
+import types
+import random
+import hashlib
+import sqlite3
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+EMBEDDING_DIM = 384
+
+WORDS = (
+    "hotel room suite beach mountain breakfast pool spa guest checkin checkout "
+    "policy refund deposit parking wifi airport shuttle view balcony family "
+    "double single king queen amenities towel gym restaurant bar lounge"
+).split()
+
+
+# -------------------------------
+# Text and PDFs
+# -------------------------------
+def random_words(n, seed=0):
+    rng = random.Random(seed)
+    return [rng.choice(WORDS) for _ in range(n)]
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(path, pages=10, lines_per_page=50, words_per_line=12, seed=0):
+    """Write a minimal text-only PDF that pdfplumber can extract."""
+    words = random_words(pages * lines_per_page * words_per_line, seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    w = 0
+    for _ in range(pages):
+        lines = []
+        for _ in range(lines_per_page):
+            lines.append(" ".join(words[w:w + words_per_line]))
+            w += words_per_line
+        body = "BT /F1 10 Tf 14 TL 40 800 Td " + " ".join(f"({_pdf_escape(l)}) Tj T*" for l in lines) + " ET"
+        stream = body.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
+
+
+# -------------------------------
+# Stubs
+# -------------------------------
+def stub_embedding(text):
+    """Deterministic pseudo-embedding seeded by the text, in place of SentenceTransformer."""
+    seed = int.from_bytes(hashlib.md5(text.encode()).digest()[:4], "little")
+    return np.random.default_rng(seed).standard_normal(EMBEDDING_DIM).astype(np.float32)
+
+
+def random_embeddings(n, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+
+
+class _StubCompletions:
+    def create(self, model, messages):
+        reply = f"Stub reply to {len(messages)} messages."
+        message = types.SimpleNamespace(content=reply)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+
+class StubLLMClient:
+    """Mimics the Groq client surface used by llm_utils.generate_answer."""
+
+    def __init__(self):
+        self.chat = types.SimpleNamespace(completions=_StubCompletions())
+
+
+def install_stub_email():
+    """Replace email_utils so the booking flow never reaches SendGrid."""
+    module = types.ModuleType("email_utils")
+    module.send_confirmation_email = lambda booking: True
+    sys.modules["email_utils"] = module
+
+
+# -------------------------------
+# Database
+# -------------------------------
+def use_temp_db():
+    """Point db.DB_PATH at a fresh temp file and create the schema."""
+    import db
+    fd, path = tempfile.mkstemp(prefix="guidepro_bench_", suffix=".db")
+    os.close(fd)
+    db.DB_PATH = path
+    db.init_db()
+    return path
+
+
+def fill_bookings(n, seed=0):
+    """Bulk-insert n synthetic bookings into the current db.DB_PATH."""
+    import db
+    rng = random.Random(seed)
+    rows = [
+        (f"Guest {i}", f"guest{i}@example.com", "5550100", "Oceanview Resort",
+         rng.choice(["Goa", "Manali", "Paris"]), "2026-01-01", "2026-01-05",
+         rng.randint(1, 6), "", "2026-01-01T00:00:00")
+        for i in range(n)
+    ]
+    conn = sqlite3.connect(db.DB_PATH)
+    conn.executemany("""
+    INSERT INTO bookings (name,email,phone,hotel,destination,checkin,checkout,guests,notes,created_at)
+    VALUES (?,?,?,?,?,?,?,?,?,?)
+    """, rows)
+    conn.commit()
+    conn.close()
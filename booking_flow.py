@@ -1,6 +1,6 @@
-import streamlit as st
 from datetime import datetime
 import re
+from tracing import traced
 
 # Words that indicate the user wants to start a booking
 BOOKING_KEYWORDS = ["book", "booking", "reserve", "reservation", "hotel", "trip", "room"]
@@ -27,18 +27,18 @@ def get_missing_slot(required_slots, data):
     return None, None
 
 
-def start_booking_flow(user_input: str):
+def start_booking_flow(user_input: str, state):
     """
     Detect user intent to start booking. If detected and no booking in progress,
-    initialize required slots and booking state in session_state and return True.
-    If booking already in progress, just return True.
+    initialize required slots and booking state on `state` (a ConversationState)
+    and return True. If booking already in progress, just return True.
     """
     if not user_input:
         return False
     text = user_input.lower()
 
     # If already in a booking flow, keep it going
-    if st.session_state.get("booking_in_progress", False):
+    if state.booking_in_progress:
         return True
 
     if any(k in text for k in BOOKING_KEYWORDS):
@@ -54,14 +54,14 @@ def start_booking_flow(user_input: str):
             ("guests", "number of guests"),
         ]
 
-        st.session_state.required_slots = required_slots
-        st.session_state.filled_slots = {}
-        st.session_state.current_booking_data = {}
-        st.session_state.booking_in_progress = True
+        state.required_slots = required_slots
+        state.filled_slots = {}
+        state.current_booking_data = {}
+        state.booking_in_progress = True
 
         # This flag indicates we just started — the next call to handle_booking_turn
         # should *ask* the first slot rather than taking the trigger utterance as the answer.
-        st.session_state.booking_just_started = True
+        state.booking_just_started = True
 
         return True
 
@@ -71,26 +71,19 @@ def start_booking_flow(user_input: str):
 # -------------------------------
 # MAIN STATE MACHINE
 # -------------------------------
-def handle_booking_turn(user_input: str):
+@traced("booking.handle_turn")
+def handle_booking_turn(user_input: str, state):
     """
     Manages the booking conversation. Assumes start_booking_flow() was called
-    and st.session_state.booking_in_progress is True.
+    and state.booking_in_progress is True.
     """
 
-    # Ensure session variables exist (defensive)
-    if "required_slots" not in st.session_state:
-        st.session_state.required_slots = []
-    if "current_booking_data" not in st.session_state:
-        st.session_state.current_booking_data = {}
-    if "booking_in_progress" not in st.session_state:
-        st.session_state.booking_in_progress = False
-
-    data = st.session_state.current_booking_data
-    required_slots = st.session_state.required_slots
+    data = state.current_booking_data
+    required_slots = state.required_slots
 
     # If booking was just started, ask the first question (don't interpret the trigger as an answer)
-    if st.session_state.get("booking_just_started", False):
-        st.session_state.booking_just_started = False
+    if state.booking_just_started:
+        state.booking_just_started = False
         first_key, first_prompt = get_missing_slot(required_slots, data)
         if first_key:
             return f"Sure — let's book your hotel. What is your **{first_prompt}**?"
@@ -121,23 +114,23 @@ def handle_booking_turn(user_input: str):
             except Exception:
                 email_msg = "but the confirmation email could not be sent."
 
-            # Reset flow (clean up session state)
+            # Reset flow (clean up conversation state)
             data.pop("_AWAITING_CONFIRMATION", None)
-            st.session_state.booking_in_progress = False
-            st.session_state.booking_just_started = False
-            st.session_state.required_slots = []
-            st.session_state.filled_slots = {}
-            st.session_state.current_booking_data = {}
+            state.booking_in_progress = False
+            state.booking_just_started = False
+            state.required_slots = []
+            state.filled_slots = {}
+            state.current_booking_data = {}
 
             return f"🎉 **Your booking is confirmed!** The details have been saved {email_msg}"
 
         elif choice in ["no", "n", "cancel"]:
             # Cancel and cleanup
-            st.session_state.current_booking_data = {}
-            st.session_state.booking_in_progress = False
-            st.session_state.booking_just_started = False
-            st.session_state.required_slots = []
-            st.session_state.filled_slots = {}
+            state.current_booking_data = {}
+            state.booking_in_progress = False
+            state.booking_just_started = False
+            state.required_slots = []
+            state.filled_slots = {}
             return "❌ Booking cancelled. How else may I assist you?"
 
         else:
@@ -186,7 +179,7 @@ def handle_booking_turn(user_input: str):
 
         # If valid → store it
         data[slot_to_fill] = input_value
-        st.session_state.current_booking_data = data  # persist
+        state.current_booking_data = data  # persist
 
         # Ask next missing slot
         next_key, next_prompt = get_missing_slot(required_slots, data)
@@ -196,7 +189,7 @@ def handle_booking_turn(user_input: str):
 
         # If all slots collected → ask for final confirmation
         data["_AWAITING_CONFIRMATION"] = True
-        st.session_state.current_booking_data = data
+        state.current_booking_data = data
 
         summary = f"""
 ### 📄 Booking Summary
@@ -218,6 +211,6 @@ Please reply **Yes** or **No**.
     # BACKUP — lost flow
     # ---------------------------
     # If this happens, try to reset booking flags defensively
-    st.session_state.booking_in_progress = False
-    st.session_state.booking_just_started = False
+    state.booking_in_progress = False
+    state.booking_just_started = False
     return "I seem to have lost the booking flow. Please say **Book Hotel** to start again."
@@ -0,0 +1,202 @@
+# chat_engine.py
+#
+# Headless chat core. Holds no Streamlit state: every call takes an explicit
+# ConversationState, so the same engine serves app.py, server.py and the
+# load generator.
+
+import json
+import uuid
+import asyncio
+from dataclasses import dataclass, field, asdict
+
+from booking_flow import start_booking_flow, handle_booking_turn
+from db import (
+    init_db, add_chat_message, get_chat_messages, count_chat_messages,
+    save_conversation, load_conversation, acquire_conversation, release_conversation,
+)
+from llm_utils import generate_answer
+from rag import corpus_id_for, find_shared_store, load_shared_store
+from tracing import new_trace, span
+
+# Number of chat messages kept in memory; older ones stay in the DB
+CHAT_WINDOW = 30
+
+GREETING = "Hello! 👋 I’m GuidePro AI. How can I assist your travel today?"
+
+PDF_RELOAD_MESSAGE = "📄 Your PDF is no longer loaded. Please upload it again to ask questions about it."
+
+# Informational words that send a message to the RAG store (when a PDF is loaded)
+RAG_KEYWORDS = [
+    "room", "rooms", "room type", "room types", "amenities", "features",
+    "summary", "pdf", "document", "information", "details",
+    "policy", "faq", "hotel", "rules"
+]
+
+
+@dataclass
+class ConversationState:
+    """Everything one conversation needs between turns. JSON-serializable."""
+    conversation_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    chat: list = field(default_factory=list)
+    chat_window: int = CHAT_WINDOW
+    rag_corpus_id: str = None
+
+    # booking slot-filling state (see booking_flow.py)
+    booking_in_progress: bool = False
+    booking_just_started: bool = False
+    required_slots: list = field(default_factory=list)
+    filled_slots: dict = field(default_factory=dict)
+    current_booking_data: dict = field(default_factory=dict)
+
+    # version of the stored row this state was loaded from (see db.save_conversation)
+    version: int = 0
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, data: str) -> "ConversationState":
+        return cls(**json.loads(data))
+
+
+class ChatEngine:
+    """
+    Routes each user message to RAG → booking flow → LLM fallback.
+
+    Args:
+        llm_client: Groq client (or anything with the same chat.completions API); None disables the LLM.
+        persist (bool): Store chat messages and conversation state in SQLite.
+    """
+
+    def __init__(self, llm_client=None, persist=True):
+        self.llm_client = llm_client
+        self.persist = persist
+        if persist:
+            init_db()
+
+    # -------------------------------
+    # Conversations
+    # -------------------------------
+    def new_conversation(self, conversation_id=None) -> ConversationState:
+        state = ConversationState(conversation_id=conversation_id or uuid.uuid4().hex)
+        self.append_message(state, "assistant", GREETING)
+        return state
+
+    def load_state(self, conversation_id) -> ConversationState:
+        """Return the stored conversation, or start a new one under that id."""
+        data, version = load_conversation(conversation_id) if self.persist else (None, 0)
+        state = self.new_conversation(conversation_id) if data is None else ConversationState.from_json(data)
+        state.version = version
+        return state
+
+    def save_state(self, state: ConversationState) -> bool:
+        """Store the state; False if the stored conversation changed since it was loaded."""
+        if not self.persist:
+            return True
+        if not save_conversation(state.conversation_id, state.to_json(), state.version):
+            return False
+        state.version += 1
+        return True
+
+    def acquire_conversation(self, conversation_id, lease_seconds):
+        """Take the cross-process lease on a conversation; returns a token or None if busy."""
+        if not self.persist:
+            return "local"
+        return acquire_conversation(conversation_id, lease_seconds)
+
+    def release_conversation(self, conversation_id, token):
+        if self.persist:
+            release_conversation(conversation_id, token)
+
+    # -------------------------------
+    # Chat history
+    # -------------------------------
+    def append_message(self, state: ConversationState, role, content):
+        """Persist a message and append it to the in-memory window, trimming the window."""
+        msg_id = add_chat_message(state.conversation_id, role, content) if self.persist else None
+        msg = {"id": msg_id, "role": role, "content": content}
+        state.chat.append(msg)
+        if len(state.chat) > state.chat_window:
+            del state.chat[:-state.chat_window]
+        return msg
+
+    def has_earlier_messages(self, state: ConversationState) -> bool:
+        return self.persist and count_chat_messages(state.conversation_id) > len(state.chat)
+
+    def load_earlier_messages(self, state: ConversationState, page_size=CHAT_WINDOW) -> int:
+        """
+        Page the previous `page_size` messages from the DB in front of the window. Returns how many were loaded.
+        The window size itself is unchanged, so the next append_message trims paged-in history back to it.
+        """
+        if not self.persist:
+            return 0
+        before_id = state.chat[0]["id"] if state.chat else None
+        older = get_chat_messages(state.conversation_id, limit=page_size, before_id=before_id)
+        if older:
+            state.chat = older + state.chat
+        return len(older)
+
+    # -------------------------------
+    # RAG
+    # -------------------------------
+    def load_pdf(self, state: ConversationState, pdf_file) -> int:
+        """Attach a PDF corpus to the conversation, embedding it only if it is not already loaded. Returns chunk count."""
+        corpus_id = corpus_id_for(pdf_file)
+        store = load_shared_store(corpus_id, pdf_file)
+        if store is None:
+            return 0
+        state.rag_corpus_id = corpus_id
+        return len(store.chunks)
+
+    def rag_store(self, state: ConversationState):
+        """The conversation's loaded RAGStore, or None (no PDF, or evicted and needing a re-load)."""
+        return find_shared_store(state.rag_corpus_id)
+
+    def needs_pdf_reload(self, state: ConversationState) -> bool:
+        return state.rag_corpus_id is not None and self.rag_store(state) is None
+
+    # -------------------------------
+    # Turn handling
+    # -------------------------------
+    def route(self, state: ConversationState, user_input: str) -> str:
+        """
+        Return "rag", "booking" or "llm". May start a booking flow on `state`.
+        "rag" only says the message is for the PDF; its store may since have been evicted.
+        """
+        user_msg = user_input.lower()
+        if state.rag_corpus_id is not None:
+            # Trigger RAG for any informational query
+            if "?" in user_msg or any(k in user_msg for k in RAG_KEYWORDS):
+                return "rag"
+        if start_booking_flow(user_input, state) or state.booking_in_progress:
+            return "booking"
+        return "llm"
+
+    def respond(self, state: ConversationState, user_input: str) -> str:
+        """Synchronous turn: record the user message, produce and record the reply."""
+        with span("chat.append"):
+            self.append_message(state, "user", user_input)
+
+        with span("chat.routing"):
+            route = self.route(state, user_input)
+
+        if route == "rag":
+            # look the store up once: another conversation's upload can evict it at any time
+            store = self.rag_store(state)
+            reply = store.query(user_input) if store is not None else PDF_RELOAD_MESSAGE
+        elif route == "booking":
+            reply = handle_booking_turn(user_input, state)
+        else:
+            reply = generate_answer(self.llm_client, state.chat)
+
+        self.append_message(state, "assistant", reply)
+        return reply
+
+    async def handle_message(self, state: ConversationState, user_input: str) -> str:
+        """
+        Async entry point for one user message. The blocking pipeline runs in a
+        worker thread so the event loop stays free; callers must not send two
+        messages for the same conversation concurrently.
+        """
+        new_trace()
+        return await asyncio.to_thread(self.respond, state, user_input)
@@ -0,0 +1,19 @@
+# config.py
+
+import os
+
+
+def get_setting(name, default=None):
+    """
+    Read a setting from the environment, falling back to Streamlit secrets.
+    Lets the modules run outside a Streamlit script (API server, load tests).
+    """
+    value = os.getenv(name)
+    if value is not None:
+        return value
+    try:
+        import streamlit as st
+        return st.secrets.get(name, default)
+    except Exception:
+        # no Streamlit or no secrets.toml
+        return default
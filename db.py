@@ -1,7 +1,10 @@
 # db.py
+import time
+import uuid
 import sqlite3
 import pandas as pd
 from datetime import datetime
+from tracing import traced
 DB_PATH = "bookings.db"
 
 def init_db():
@@ -22,9 +25,35 @@ def init_db():
         created_at TEXT
     )
     """)
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS chat_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT,
+        role TEXT,
+        content TEXT,
+        created_at TEXT
+    )
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_chat_session ON chat_messages (session_id, id)")
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS conversations (
+        id TEXT PRIMARY KEY,
+        state TEXT,
+        updated_at TEXT,
+        version INTEGER DEFAULT 0,
+        lease_owner TEXT,
+        lease_until REAL
+    )
+    """)
+    # conversations tables created before versioning/leases
+    cols = {row[1] for row in c.execute("PRAGMA table_info(conversations)")}
+    for col, decl in [("version", "INTEGER DEFAULT 0"), ("lease_owner", "TEXT"), ("lease_until", "REAL")]:
+        if col not in cols:
+            c.execute(f"ALTER TABLE conversations ADD COLUMN {col} {decl}")
     conn.commit()
     conn.close()
 
+@traced("db.add_booking")
 def add_booking(booking: dict):
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
@@ -46,6 +75,7 @@ def add_booking(booking: dict):
     conn.commit()
     conn.close()
 
+@traced("db.get_bookings")
 def get_bookings():
     conn = sqlite3.connect(DB_PATH)
     df = pd.read_sql_query("SELECT * FROM bookings ORDER BY id DESC", conn)
@@ -63,3 +93,106 @@ def export_bookings_csv(path="bookings_export.csv"):
     df = get_bookings()
     df.to_csv(path, index=False)
     return path
+
+# ----------------------------------------------------------
+# CHAT HISTORY (append-only)
+# ----------------------------------------------------------
+def add_chat_message(session_id, role, content):
+    """Append one chat message and return its row id."""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("""
+    INSERT INTO chat_messages (session_id,role,content,created_at)
+    VALUES (?,?,?,?)
+    """, (session_id, role, content, datetime.utcnow().isoformat()))
+    msg_id = c.lastrowid
+    conn.commit()
+    conn.close()
+    return msg_id
+
+def get_chat_messages(session_id, limit=50, before_id=None):
+    """
+    Return up to `limit` messages of a session, oldest first.
+    If `before_id` is given, only messages older than that id are returned
+    (used to page in earlier history).
+    """
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    if before_id is None:
+        c.execute("""
+        SELECT id, role, content FROM chat_messages
+        WHERE session_id = ? ORDER BY id DESC LIMIT ?
+        """, (session_id, limit))
+    else:
+        c.execute("""
+        SELECT id, role, content FROM chat_messages
+        WHERE session_id = ? AND id < ? ORDER BY id DESC LIMIT ?
+        """, (session_id, before_id, limit))
+    rows = c.fetchall()
+    conn.close()
+    return [{"id": r[0], "role": r[1], "content": r[2]} for r in reversed(rows)]
+
+def count_chat_messages(session_id):
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("SELECT COUNT(*) FROM chat_messages WHERE session_id = ?", (session_id,))
+    n = c.fetchone()[0]
+    conn.close()
+    return n
+
+# ----------------------------------------------------------
+# CONVERSATION STATE (for the headless engine / API server)
+# ----------------------------------------------------------
+# Turns of one conversation are serialized across server workers with a
+# short lease on its row (not a long write transaction, which would block the
+# chat/booking writes made during the turn). Saves are compare-and-swap on
+# `version`, so an expired lease can never silently overwrite a newer state.
+
+def acquire_conversation(conversation_id, lease_seconds):
+    """Try to take the conversation's lease. Returns an owner token, or None if another turn holds it."""
+    token = uuid.uuid4().hex
+    now = time.time()
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("INSERT OR IGNORE INTO conversations (id,version) VALUES (?,0)", (conversation_id,))
+    c.execute("""
+    UPDATE conversations SET lease_owner = ?, lease_until = ?
+    WHERE id = ? AND (lease_until IS NULL OR lease_until < ?)
+    """, (token, now + lease_seconds, conversation_id, now))
+    acquired = c.rowcount == 1
+    conn.commit()
+    conn.close()
+    return token if acquired else None
+
+def release_conversation(conversation_id, token):
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("""
+    UPDATE conversations SET lease_owner = NULL, lease_until = NULL
+    WHERE id = ? AND lease_owner = ?
+    """, (conversation_id, token))
+    conn.commit()
+    conn.close()
+
+def save_conversation(conversation_id, state_json, version):
+    """Store state if the row is still at `version`. Returns False if someone else saved first."""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("INSERT OR IGNORE INTO conversations (id,version) VALUES (?,0)", (conversation_id,))
+    c.execute("""
+    UPDATE conversations SET state = ?, updated_at = ?, version = version + 1
+    WHERE id = ? AND version = ?
+    """, (state_json, datetime.utcnow().isoformat(), conversation_id, version))
+    saved = c.rowcount == 1
+    conn.commit()
+    conn.close()
+    return saved
+
+def load_conversation(conversation_id):
+    """Return (state JSON or None, version); (None, 0) if the conversation is unknown."""
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("SELECT state, version FROM conversations WHERE id = ?", (conversation_id,))
+    row = c.fetchone()
+    conn.close()
+    return (row[0], row[1] or 0) if row else (None, 0)
@@ -1,13 +1,15 @@
 # email_utils.py -- SendGrid API version (works WITHOUT domain verification)
 import requests
-import streamlit as st
+from config import get_setting
+from tracing import traced
 
-SENDGRID_API_KEY = st.secrets["SENDGRID_API_KEY"]
-FROM_EMAIL = st.secrets["FROM_EMAIL"]
+SENDGRID_API_KEY = get_setting("SENDGRID_API_KEY")
+FROM_EMAIL = get_setting("FROM_EMAIL")
 
 SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
 
 
+@traced("email.send_confirmation")
 def send_confirmation_email(booking):
     to_email = booking.get("email")
 
@@ -1,17 +1,18 @@
-import streamlit as st
 from groq import Groq
+from config import get_setting
+from tracing import traced
 
 # Load Groq LLM API key
-GROQ_API_KEY = st.secrets.get("GROQ_API_KEY")
+GROQ_API_KEY = get_setting("GROQ_API_KEY")
 
 # Load LLM model
-LLM_MODEL = st.secrets.get("LLM_MODEL", "llama-3.1-8b-instant")
+LLM_MODEL = get_setting("LLM_MODEL", "llama-3.1-8b-instant")
 
 
 def get_llm_client():
     """Initialize and return the Groq LLM client."""
     if not GROQ_API_KEY:
-        print("❌ ERROR: GROQ_API_KEY missing in Streamlit Secrets")
+        print("❌ ERROR: GROQ_API_KEY missing in environment / Streamlit Secrets")
         return None
     
     try:
@@ -22,6 +23,7 @@ def get_llm_client():
         return None
 
 
+@traced("llm.generate_answer")
 def generate_answer(client, messages):
     """Send messages to the Groq LLM and return a response."""
     if client is None:
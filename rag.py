@@ -1,27 +1,32 @@
 # rag.py
 
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 import numpy as np
 import pdfplumber
-import streamlit as st
-from sentence_transformers import SentenceTransformer
 from typing import List
+from tracing import traced
 
 # -------------------------------
 # Local Embedding Model
 # -------------------------------
-@st.cache_resource
+@lru_cache(maxsize=1)
 def load_local_model():
+    # Imported here so torch and the model are only loaded on the first embedding,
+    # not whenever rag is imported (e.g. by the offline benchmarks)
+    from sentence_transformers import SentenceTransformer
     return SentenceTransformer("all-MiniLM-L6-v2")
 
-local_model = load_local_model()
-
 
+@traced("rag.embed")
 def get_embedding(text: str) -> np.ndarray:
     """Generate embeddings using local SentenceTransformer."""
     try:
-        return local_model.encode(text)
+        return load_local_model().encode(text)
     except Exception as e:
-        st.error(f"Local embedding error: {e}")
+        print("❌ Local embedding error:", e)
         return np.zeros(384)
 
 
@@ -46,7 +51,7 @@ def extract_pdf_text(pdf_file) -> str:
                     text += t + "\n"
         return text.strip()
     except Exception as e:
-        st.error(f"PDF read error: {e}")
+        print("❌ PDF read error:", e)
         return ""
 
 
@@ -58,23 +63,22 @@ class RAGStore:
         self.chunks = []
         self.embeddings = []
 
-    def add_pdf(self, pdf_file):
-        """Load PDF → extract text → chunk → embed."""
+    @traced("rag.add_pdf")
+    def add_pdf(self, pdf_file) -> int:
+        """Load PDF → extract text → chunk → embed. Returns the number of chunks (0 if unreadable)."""
         text = extract_pdf_text(pdf_file)
         if not text:
-            st.error("PDF contains no readable text.")
-            return
+            print("❌ PDF contains no readable text.")
+            return 0
 
         chunks = chunk_text(text)
-        self.chunks = chunks
-        self.embeddings = []
+        embeddings = [get_embedding(chunk) for chunk in chunks]
 
-        for chunk in chunks:
-            emb = get_embedding(chunk)
-            self.embeddings.append(emb)
-
-        st.success(f"PDF processed — {len(chunks)} chunks added.")
+        # Swap in only once fully built, so readers never see a partial store
+        self.chunks, self.embeddings = chunks, embeddings
+        return len(chunks)
 
+    @traced("rag.query")
     def query(self, question: str) -> str:
         """Return the most relevant PDF chunk."""
         if not self.embeddings:
@@ -89,3 +93,59 @@ class RAGStore:
 
         best_idx = int(np.argmax(sims))
         return self.chunks[best_idx]
+
+
+# -------------------------------
+# Shared stores (one per corpus)
+# -------------------------------
+def corpus_id_for(pdf_file) -> str:
+    """Stable id for an uploaded PDF, derived from its bytes."""
+    return hashlib.sha1(pdf_file.getvalue()).hexdigest()
+
+
+MAX_SHARED_STORES = 16
+
+_shared_stores = OrderedDict()
+_shared_lock = threading.Lock()
+
+
+def find_shared_store(corpus_id: str):
+    """
+    Return the loaded RAGStore for a corpus, or None if it was never loaded or
+    has been evicted (the PDF then has to be loaded again). Stores live in a
+    process-wide LRU registry, so conversations only keep the corpus id
+    instead of their own copy of the chunks and embeddings.
+    """
+    if corpus_id is None:
+        return None
+    with _shared_lock:
+        store = _shared_stores.get(corpus_id)
+        if store is not None:
+            _shared_stores.move_to_end(corpus_id)
+        return store
+
+
+def load_shared_store(corpus_id: str, pdf_file):
+    """
+    Return the shared store for a corpus, embedding the PDF if it is not loaded.
+    The store is built privately and registered only when complete; if another
+    thread registered the same corpus meanwhile, that store wins.
+    Returns None if the PDF has no readable text.
+    """
+    store = find_shared_store(corpus_id)
+    if store is not None:
+        return store
+
+    store = RAGStore()
+    if not store.add_pdf(pdf_file):
+        return None
+
+    with _shared_lock:
+        existing = _shared_stores.get(corpus_id)
+        if existing is not None:
+            _shared_stores.move_to_end(corpus_id)
+            return existing
+        _shared_stores[corpus_id] = store
+        if len(_shared_stores) > MAX_SHARED_STORES:
+            _shared_stores.popitem(last=False)
+        return store
@@ -0,0 +1,84 @@
+# server.py
+#
+# Optional HTTP API over ChatEngine (no Streamlit involved).
+#
+#   pip install fastapi uvicorn
+#   uvicorn server:app --workers 4
+#
+# POST /chat {"conversation_id": "...", "message": "..."} → {"conversation_id", "reply"}
+# Conversation state is stored in SQLite after every turn, so any worker can
+# serve any conversation. Turns of one conversation are serialized across
+# workers by a lease on its row; a turn that cannot get it in time gets 409.
+
+import time
+import asyncio
+import uuid
+
+from dotenv import load_dotenv
+load_dotenv()
+
+try:
+    from fastapi import FastAPI, HTTPException
+    from pydantic import BaseModel
+except ImportError as e:
+    raise ImportError("server.py needs the optional API dependencies: pip install fastapi uvicorn") from e
+
+from chat_engine import ChatEngine
+from llm_utils import get_llm_client
+from tracing import latency_summary
+
+engine = ChatEngine(get_llm_client())
+app = FastAPI(title="GuidePro AI")
+
+# A turn holding the lease longer than this (e.g. a crashed worker) loses it
+LEASE_SECONDS = 120
+# How long a turn waits for another turn of the same conversation to finish
+LEASE_WAIT_SECONDS = 30
+LEASE_POLL_SECONDS = 0.05
+
+
+class ChatRequest(BaseModel):
+    message: str
+    conversation_id: str = None
+
+
+class ChatResponse(BaseModel):
+    conversation_id: str
+    reply: str
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(req: ChatRequest):
+    conversation_id = req.conversation_id or uuid.uuid4().hex
+
+    deadline = time.monotonic() + LEASE_WAIT_SECONDS
+    while True:
+        token = await asyncio.to_thread(engine.acquire_conversation, conversation_id, LEASE_SECONDS)
+        if token:
+            break
+        if time.monotonic() > deadline:
+            raise HTTPException(status_code=409, detail="Conversation is busy with another message; retry.")
+        await asyncio.sleep(LEASE_POLL_SECONDS)
+
+    try:
+        state = await asyncio.to_thread(engine.load_state, conversation_id)
+        reply = await engine.handle_message(state, req.message)
+        saved = await asyncio.to_thread(engine.save_state, state)
+    finally:
+        await asyncio.to_thread(engine.release_conversation, conversation_id, token)
+
+    if not saved:
+        # only possible if our lease expired mid-turn and another turn saved first
+        raise HTTPException(status_code=409, detail="Conversation changed during this turn; retry.")
+    return ChatResponse(conversation_id=conversation_id, reply=reply)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Per-stage latency percentiles of this worker (GUIDEPRO_TRACING=1)."""
+    return latency_summary()
@@ -0,0 +1,223 @@
+# tracing.py
+#
+# Lightweight latency tracing for the chat pipeline.
+# Enable with GUIDEPRO_TRACING=1; when disabled, span() is a shared no-op and
+# @traced returns the function unchanged, so there is no per-call overhead.
+
+import os
+import json
+import time
+import uuid
+import queue
+import atexit
+import threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+import numpy as np
+
+TRACING_ENABLED = os.getenv("GUIDEPRO_TRACING", "0").lower() in ("1", "true", "yes")
+TRACE_PATH = os.getenv("GUIDEPRO_TRACE_PATH", "traces.jsonl")
+
+# Samples kept per stage for the percentile histograms
+MAX_SAMPLES = 5000
+
+_samples = defaultdict(lambda: deque(maxlen=MAX_SAMPLES))
+_lock = threading.Lock()
+_trace_id = ContextVar("trace_id", default=None)
+
+# Span events are written to TRACE_PATH by one background thread, so callers never wait on disk.
+# The queue is bounded: if the writer falls behind, new events are dropped (and counted).
+MAX_PENDING_EVENTS = 10000
+
+_events = queue.Queue(maxsize=MAX_PENDING_EVENTS)
+_writer = None
+# Cleared if TRACE_PATH cannot be opened or written; histograms keep working
+_file_output = True
+_dropped_events = 0
+_writer_lock = threading.Lock()
+_STOP = object()
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+# -------------------------------
+# Trace ids
+# -------------------------------
+def new_trace() -> str:
+    """Start a new trace (one per chat turn) and return its id."""
+    trace_id = uuid.uuid4().hex[:16]
+    _trace_id.set(trace_id)
+    return trace_id
+
+
+def current_trace():
+    return _trace_id.get()
+
+
+# -------------------------------
+# Spans
+# -------------------------------
+def _disable_file_output(reason):
+    global _file_output
+    _file_output = False
+    print("❌ Trace file output disabled:", reason)
+    # discard anything already queued
+    try:
+        while True:
+            _events.get_nowait()
+    except queue.Empty:
+        pass
+
+
+def _write_events():
+    """Drain the event queue into TRACE_PATH through one buffered file handle."""
+    try:
+        f = open(TRACE_PATH, "a", encoding="utf-8")
+    except OSError as e:
+        _disable_file_output(e)
+        return
+    with f:
+        while True:
+            event = _events.get()
+            if event is _STOP:
+                break
+            try:
+                f.write(json.dumps(event) + "\n")
+                # flush once the burst is written, not per event
+                if _events.empty():
+                    f.flush()
+            except OSError as e:
+                _disable_file_output(e)
+                return
+
+
+def _stop_writer():
+    if _writer is not None:
+        try:
+            _events.put(_STOP, timeout=1)
+        except queue.Full:
+            return
+        _writer.join(timeout=2)
+
+
+def _ensure_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_write_events, name="trace-writer", daemon=True)
+            _writer.start()
+            atexit.register(_stop_writer)
+
+
+def _enqueue(event):
+    global _dropped_events
+    try:
+        _events.put_nowait(event)
+    except queue.Full:
+        _dropped_events += 1
+
+
+def _record(name, start, duration_ms, error):
+    with _lock:
+        _samples[name].append(duration_ms)
+
+    if not _file_output:
+        return
+    if _writer is None:
+        _ensure_writer()
+    _enqueue({
+        "trace_id": _trace_id.get(),
+        "span": name,
+        "start": start,
+        "ms": round(duration_ms, 3),
+        "error": error,
+    })
+
+
+@contextmanager
+def _span(name):
+    start = time.time()
+    t0 = time.monotonic()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _record(name, start, (time.monotonic() - t0) * 1000, error)
+
+
+def span(name: str):
+    """Context manager timing one pipeline stage."""
+    if not TRACING_ENABLED:
+        return _NOOP
+    return _span(name)
+
+
+def traced(name: str):
+    """Decorator form of span(); a no-op when tracing is disabled."""
+    def decorator(func):
+        if not TRACING_ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# -------------------------------
+# Histograms
+# -------------------------------
+def latency_summary():
+    """Return one row per stage with count and p50/p95/p99 latency in ms."""
+    with _lock:
+        snapshot = {name: list(values) for name, values in _samples.items()}
+
+    rows = []
+    for name, values in sorted(snapshot.items()):
+        if not values:
+            continue
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        rows.append({
+            "stage": name,
+            "count": len(values),
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+        })
+    return rows
+
+
+def dump_metrics(path="metrics.jsonl"):
+    """Append the current latency summary to a JSONL file, one line per stage."""
+    ts = time.time()
+    with open(path, "a", encoding="utf-8") as f:
+        for row in latency_summary():
+            f.write(json.dumps({"ts": ts, **row}) + "\n")
+    return path
+
+
+def trace_output_status():
+    """Whether span events are still written to TRACE_PATH, and how many were dropped."""
+    return {"path": TRACE_PATH, "enabled": TRACING_ENABLED and _file_output, "dropped": _dropped_events}
+
+
+def reset_metrics():
+    with _lock:
+        _samples.clear()
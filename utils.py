@@ -1,44 +1,214 @@
+import re
+import sys
+import html
+import hashlib
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+import markdown
+from markdown.treeprocessors import Treeprocessor
+from markdown.util import AMP_SUBSTITUTE
 import streamlit as st
 
-def render_chat_bubble(message, extra_css=""):
+MARKDOWN_EXTENSIONS = ["nl2br", "sane_lists", "fenced_code"]
+
+# Link/image URL schemes allowed in rendered messages; relative URLs have no scheme
+SAFE_URL_SCHEMES = {"", "http", "https", "mailto"}
+
+_LIST_ITEM = re.compile(r"^\s*([-*+]|\d+\.)\s")
+_PRE_BLOCK = re.compile(r"(<pre>.*?</pre>)", re.DOTALL)
+_md_local = threading.local()
+
+# Converted bubbles shared by all sessions: ~650 sessions with a 30-message window
+BUBBLE_CACHE_SIZE = 20_000
+
+_bubble_cache = OrderedDict()
+_bubble_lock = threading.Lock()
+_bubble_stats = {"hits": 0, "misses": 0}
+_URL_JUNK = re.compile(r"[\x00-\x20\x7f]")
+
+
+class _SafeUrlTreeprocessor(Treeprocessor):
+    """Drops href/src attributes whose scheme is not allowed (e.g. javascript:, data:)."""
+
+    def run(self, root):
+        for el in root.iter():
+            for attr in ("href", "src"):
+                url = el.get(attr)
+                if url is None:
+                    continue
+                # browsers decode entities ("&#106;avascript:") and ignore whitespace/control
+                # characters ("java\tscript:") before reading the scheme
+                url = html.unescape(url.replace(AMP_SUBSTITUTE, "&"))
+                scheme = urlparse(_URL_JUNK.sub("", url)).scheme.lower()
+                if scheme not in SAFE_URL_SCHEMES:
+                    del el.attrib[attr]
+
+
+def _markdown():
+    """
+    Per-thread Markdown converter with raw HTML disabled, so any HTML in user,
+    LLM or PDF text is escaped as plain text (and code blocks are not escaped twice),
+    and with unsafe link/image URLs stripped.
+    """
+    md = getattr(_md_local, "md", None)
+    if md is None:
+        md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        md.preprocessors.deregister("html_block")
+        md.inlinePatterns.deregister("html")
+        # after "inline" (20), which creates the <a>/<img> elements
+        md.treeprocessors.register(_SafeUrlTreeprocessor(md), "safe_urls", 5)
+        _md_local.md = md
+    return md.reset()
+
+
+def _separate_lists(text):
+    """Python-Markdown only starts a list after a blank line; LLM replies often omit it."""
+    out = []
+    in_fence = False
+    prev = ""
+    for line in text.split("\n"):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        elif not in_fence and _LIST_ITEM.match(line) and prev.strip() and not _LIST_ITEM.match(prev):
+            out.append("")
+        out.append(line)
+        prev = line
+    return "\n".join(out)
+
+
+def _contiguous_html(markup):
+    """
+    st.markdown ends a raw HTML block at the first blank line, so drop blank lines
+    outside <pre>; inside <pre>, newlines become &#10; to keep code intact.
+    """
+    parts = _PRE_BLOCK.split(markup)
+    for i, part in enumerate(parts):
+        if i % 2:
+            parts[i] = part.replace("\n", "&#10;")
+        else:
+            parts[i] = "\n".join(line for line in part.splitlines() if line.strip())
+    return "\n".join(p for p in parts if p)
+
+
+def bubble_html(role, content, extra_css="", msg_id=None):
     """
-    Renders a styled chat bubble (user or bot) with appropriate alignment, 
-    an emoji, and converts Markdown bold (**) to HTML bold (<b>).
-    
+    Returns the HTML for one chat bubble, converting each message only once.
+    Memoized in a process-wide LRU keyed on the message id (chat messages are
+    append-only) or, for messages without an id, a hash of the content.
+
     Args:
-        message (dict): A dictionary with "role" ("user" or "assistant") and "content".
+        role (str): "user" or "assistant".
+        content (str): Markdown message text.
         extra_css (str): Optional string for adding animation or other temporary CSS classes.
+        msg_id (int): Chat message row id, if the message is stored.
+    """
+    ident = msg_id if msg_id is not None else hashlib.sha1(content.encode("utf-8")).digest()
+    key = (role, ident, extra_css)
+    with _bubble_lock:
+        cached = _bubble_cache.get(key)
+        if cached is not None:
+            _bubble_cache.move_to_end(key)
+            _bubble_stats["hits"] += 1
+            return cached
+        _bubble_stats["misses"] += 1
+
+    rendered = _build_bubble_html(role, content, extra_css)
+    with _bubble_lock:
+        _bubble_cache[key] = rendered
+        if len(_bubble_cache) > BUBBLE_CACHE_SIZE:
+            _bubble_cache.popitem(last=False)
+    return rendered
+
+
+def bubble_cache_info():
+    """Returns hits, misses, hit_rate and size of the bubble cache."""
+    with _bubble_lock:
+        hits, misses = _bubble_stats["hits"], _bubble_stats["misses"]
+        size = len(_bubble_cache)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0, "size": size}
+
+
+def clear_bubble_cache():
+    with _bubble_lock:
+        _bubble_cache.clear()
+        _bubble_stats["hits"] = _bubble_stats["misses"] = 0
+
+
+def _build_bubble_html(role, content, extra_css=""):
     """
-    role = message["role"]
-    
-    # Use raw content
-    content = message["content"] 
-    
-    # 🌟 FIX: Convert Markdown bold (**) to HTML bold (<b>)
-    # This is a simple replacement that works for one pair of **...** in a string.
-    content = content.replace('**', '<b>', 1).replace('**', '</b>', 1) 
+    Builds the HTML for one chat bubble (user or bot) with appropriate alignment
+    and an emoji, converting the Markdown content to HTML.
+    """
+    # Convert the content on its own so a reply starting with a list, heading or code fence stays intact
+    rendered_content = _contiguous_html(_markdown().convert(_separate_lists(content)))
 
     if role == "user":
         bubble_class = "chat-user"
         align = "flex-end"
         # 👤 User message format: Content Only
-        rendered_content = content
     else:
         bubble_class = "chat-bot"
         align = "flex-start"
-        
-        # 🤖 Bot message format: Bot Emoji + Content (now correctly bolded)
-        emoji = "🤖" 
-        rendered_content = f"{emoji} {content}"
+
+        # 🤖 Bot message format: Bot Emoji + Content (inline in a leading paragraph, else on its own)
+        emoji = '<span class="chat-emoji">🤖</span>'
+        if rendered_content.startswith("<p>"):
+            rendered_content = f"<p>{emoji} {rendered_content[3:]}"
+        else:
+            rendered_content = f"{emoji}\n{rendered_content}"
 
     # Add animation css class if provided
     if extra_css:
         bubble_class += " " + extra_css
 
-    st.markdown(f"""
-    <div style="display: flex; justify-content: {align}; margin-bottom: 10px;">
-        <div class="{bubble_class}">
-            {rendered_content}
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    return (
+        f'<div style="display: flex; justify-content: {align}; margin-bottom: 10px;">'
+        f'<div class="{bubble_class}">\n{rendered_content}\n</div></div>'
+    )
+
+
+def render_chat_bubble(message, extra_css=""):
+    """
+    Renders a single styled chat bubble.
+
+    Args:
+        message (dict): A dictionary with "role" ("user" or "assistant") and "content".
+        extra_css (str): Optional string for adding animation or other temporary CSS classes.
+    """
+    st.markdown(bubble_html(message["role"], message["content"], extra_css, message.get("id")), unsafe_allow_html=True)
+
+
+def render_chat_history(messages):
+    """Renders all messages with a single st.markdown call instead of one per message."""
+    if not messages:
+        return
+    st.markdown("\n".join(bubble_html(m["role"], m["content"], msg_id=m.get("id")) for m in messages),
+                unsafe_allow_html=True)
+
+def _deep_sizeof(obj, seen):
+    """Approximate retained size of an object graph in bytes."""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(i, seen) for i in obj)
+    elif hasattr(obj, "__dict__"):
+        size += _deep_sizeof(vars(obj), seen)
+    return size
+
+
+def session_memory_report():
+    """
+    Returns a list of {"key", "bytes"} rows for the current session state,
+    largest first, with a final "TOTAL" row.
+    """
+    seen = set()
+    rows = [{"key": k, "bytes": _deep_sizeof(v, seen)} for k, v in st.session_state.items()]
+    rows.sort(key=lambda r: r["bytes"], reverse=True)
+    rows.append({"key": "TOTAL", "bytes": sum(r["bytes"] for r in rows)})
+    return rows